@@ -0,0 +1,78 @@
+"""
+File-backed TTL cache for slow, rarely-changing API results
+Entries are stored as JSON under config.CACHE_DIR
+"""
+import functools
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Optional
+import orjson
+import config
+
+
+class FileCache:
+    """Stores JSON-serializable values on disk alongside the time they were written"""
+
+    def __init__(self, cache_dir: str = config.CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key: str, ttl: float) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key
+            ttl: Maximum age in seconds
+
+        Returns:
+            The cached value, or None if missing, unreadable or expired
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry["ts"] > ttl:
+            return None
+        return entry["data"]
+
+    def set(self, key: str, data: Any) -> None:
+        """Store a value, replacing any existing entry atomically"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps({"ts": time.time(), "data": data}))
+        os.replace(tmp_path, path)
+
+
+def cached(ttl: float, cache: Optional[FileCache] = None) -> Callable:
+    """
+    Decorator caching a function's JSON-serializable result on disk
+
+    The key is the function name plus its arguments, so only use this for
+    metadata that can safely be a few minutes old - never for live prices.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = cache or file_cache
+            key = json.dumps([func.__module__, func.__qualname__, args, kwargs], sort_keys=True, default=str)
+            data = store.get(key, ttl)
+            if data is None:
+                data = func(*args, **kwargs)
+                store.set(key, data)
+            return data
+        return wrapper
+    return decorator
+
+
+# Global instance
+file_cache = FileCache()
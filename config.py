@@ -43,5 +43,9 @@ LOG_FILE = os.getenv("LOG_FILE", "arbitrage_bot.log")
 # Database
 DB_PATH = os.getenv("DB_PATH", "markets.db")
 
+# Cache (market metadata only, never live prices)
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+MARKET_CACHE_TTL_SECONDS = int(os.getenv("MARKET_CACHE_TTL_SECONDS", "300"))
+
 # Mock Mode (for testing without API keys)
 MOCK_MODE = os.getenv("MOCK_MODE", "true").lower() == "true"
@@ -1,8 +1,12 @@
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from kalshi_client.client import KalshiClient
 from cryptography.hazmat.primitives import serialization
 from py_clob_client.client import ClobClient
 from py_clob_client.constants import POLYGON
+from cache import file_cache
 
 
 KALSHI_KEY_ID = "xxx"  # Replace with your Kalshi Key ID
@@ -10,6 +14,11 @@ private_key_str = "xxx" #Replace with kalshi private key
 POLY_PRIVATE_KEY = "xxx"  # Replace with your Polygon private key
 POLYGON_RPC = "https://polygon-rpc.com"
 USDC_CONTRACT = "xxx"
+MAX_WORKERS = 50  # Polymarket markets fetched concurrently
+KALSHI_BATCH_SIZE = 100  # Tickers per Kalshi get_markets call
+PROGRESS_EVERY = 50  # Print fetch progress every N markets
+FAILED_MARKET_TTL = 300  # Seconds to skip a Polymarket market after its price fetch failed
+FAILED_MARKETS_KEY = "exArb:failed_polymarket_ids"
 private_key = serialization.load_pem_private_key(
     private_key_str.encode(),  # Convert string to bytes
     password=None
@@ -19,71 +28,113 @@ polymarket_client = ClobClient(host="https://clob.polymarket.com", key=POLY_PRIV
 
 def fetch_matched_markets():
     conn = sqlite3.connect("markets.db")
+    conn.execute("PRAGMA mmap_size=268435456")
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM matched_markets")
+    # Only the ids are needed to fetch prices; skip the question/title text
+    cursor.execute("SELECT polymarket_id, kalshi_ticker FROM matched_markets")
     matched_markets = cursor.fetchall()
     conn.close()
     return matched_markets
 
-def check_arbitrage(poly_market_id, kalshi_ticker):
+def fetch_polymarket_prices(poly_market_id):
     try:
         poly_response = polymarket_client.get_market(poly_market_id)
-        poly_yes_price = poly_response["tokens"][0]["price"]
-        poly_no_price = poly_response["tokens"][1]["price"]
+        return poly_response["question"], poly_response["tokens"][0]["price"], poly_response["tokens"][1]["price"]
     except Exception as e:
         return None
 
-    try:
-        kalshi_response = kalshi_client.get_market(kalshi_ticker)
-        kalshi_market = kalshi_response.get("market", {})
-        kalshi_yes_bid = kalshi_market.get("yes_ask")
-        kalshi_yes_price = float(kalshi_yes_bid / 100)
-        kalshi_no_bid = kalshi_market.get("no_ask")
-        kalshi_no_price = float(kalshi_no_bid / 100)
-    except Exception as e:
-        return None
+def load_failed_markets():
+    # Failures are kept across runs in the file cache, as each scan is a separate process
+    failed_markets = file_cache.get(FAILED_MARKETS_KEY, FAILED_MARKET_TTL) or {}
+    now = time.time()
+    return {market_id: failed_at for market_id, failed_at in failed_markets.items() if now - failed_at < FAILED_MARKET_TTL}
+
+def polymarket_leg_viable(poly_prices):
+    # Kalshi asks are never negative, so a pair needs at least one Polymarket side below 1 to be profitable
+    return poly_prices is not None and min(poly_prices[1], poly_prices[2]) < 1
+
+def fetch_kalshi_markets_bulk(tickers):
+    # One get_markets call per batch of tickers instead of one get_market call per ticker
+    tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+    kalshi_markets = {}
+    for start in range(0, len(tickers), KALSHI_BATCH_SIZE):
+        batch = tickers[start:start + KALSHI_BATCH_SIZE]
+        try:
+            response = kalshi_client.get_markets(tickers=",".join(batch), limit=KALSHI_BATCH_SIZE)
+        except Exception as e:
+            continue
+        for kalshi_market in response.get("markets", []):
+            kalshi_markets[kalshi_market.get("ticker")] = kalshi_market
+    return kalshi_markets
+
+def find_arbitrage(poly_prices, kalshi_markets):
+    # poly_prices and kalshi_markets are aligned per matched market; missing prices become NaN
+    poly_yes = np.asarray([prices[1] if prices else None for prices in poly_prices], dtype=np.float64)
+    poly_no = np.asarray([prices[2] if prices else None for prices in poly_prices], dtype=np.float64)
+    kalshi_yes = np.asarray([market.get("yes_ask") if market else None for market in kalshi_markets], dtype=np.float64) / 100
+    kalshi_no = np.asarray([market.get("no_ask") if market else None for market in kalshi_markets], dtype=np.float64) / 100
+
+    # Prices must be probabilities; NaN fails both bounds
+    valid = ((poly_yes >= 0) & (poly_yes <= 1) & (poly_no >= 0) & (poly_no <= 1)
+             & (kalshi_yes >= 0) & (kalshi_yes <= 1) & (kalshi_no >= 0) & (kalshi_no <= 1))
+
+    cost_yes_no = poly_yes + kalshi_no
+    cost_no_yes = kalshi_yes + poly_no
+    yes_no = valid & (cost_yes_no < 1)
+    # No-Yes arbitrage (Kalshi Yes, Polymarket No) is only reported when Yes-No isn't
+    no_yes = valid & ~yes_no & (cost_no_yes < 1)
 
     opportunities = []
-    if poly_yes_price + kalshi_no_price < 1:
-        opportunities.append({
-            "Kalshi title": kalshi_market.get("title"),
-            "Polymarket title": poly_response["question"],
-            "type": "Yes-No",
-            "polymarket_yes_price": poly_yes_price,
-            "kalshi_no_price": kalshi_no_price,
-            "profit_margin": 1 - (poly_yes_price + kalshi_no_price)
+    for i in np.flatnonzero(yes_no | no_yes):
+        if yes_no[i]:
+            opportunities.append({
+                "Kalshi title": kalshi_markets[i].get("title"),
+                "Polymarket title": poly_prices[i][0],
+                "type": "Yes-No",
+                "polymarket_yes_price": float(poly_yes[i]),
+                "kalshi_no_price": float(kalshi_no[i]),
+                "profit_margin": float(1 - cost_yes_no[i])
+            })
+        else:
+            opportunities.append({
+                "Kalshi title": kalshi_markets[i].get("title"),
+                "Polymarket title": poly_prices[i][0],
+                "type": "No-Yes",
+                "polymarket_no_price": float(poly_no[i]),
+                "kalshi_yes_price": float(kalshi_yes[i]),
+                "profit_margin": float(1 - cost_no_yes[i])
             })
-        return opportunities
-
-
-        # No-Yes Arbitrage (Kalshi Yes, Polymarket No)
-    if kalshi_yes_price + poly_no_price < 1:
-        opportunities.append({
-            "Kalshi title": kalshi_market.get("title"),
-            "Polymarket title": poly_response["question"],
-            "type": "No-Yes",
-            "polymarket_no_price": poly_no_price,
-            "kalshi_yes_price": kalshi_yes_price,
-            "profit_margin": 1 - (kalshi_yes_price + poly_no_price)
-        })
-        return opportunities
-    return None
+    return opportunities
 
 def main():
     # Retrieve matched markets
     matched_markets = fetch_matched_markets()
     print(f"Loaded {len(matched_markets)} matched markets from the database.")
 
-    # Check arbitrage opportunities
-    opportunities = []
-    i = 0
-    for market in matched_markets:
-        print(i)
-        i = i + 1
-
-        arbitrage = check_arbitrage(market[3], market[4])  # polymarket_id and kalshi_ticker
-        if arbitrage:
-            opportunities.append(arbitrage)
+    # Fetch all prices up front: Polymarket concurrently, Kalshi in batches.
+    # Markets whose Polymarket fetch failed recently are skipped without a request.
+    # Workers only read a snapshot, so which markets are skipped doesn't depend on thread timing.
+    failed_markets = load_failed_markets()
+    skip_markets = frozenset(failed_markets)
+    poly_prices = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda market: None if market[0] in skip_markets else fetch_polymarket_prices(market[0]),  # polymarket_id
+            matched_markets)
+        for i, (market, prices) in enumerate(zip(matched_markets, results), 1):
+            poly_prices.append(prices)
+            if prices is None and market[0] not in skip_markets:
+                failed_markets[market[0]] = time.time()
+            if i % PROGRESS_EVERY == 0 or i == len(matched_markets):
+                print(f"Fetched {i}/{len(matched_markets)} Polymarket markets")
+    file_cache.set(FAILED_MARKETS_KEY, failed_markets)
+
+    # Skip Kalshi lookups for pairs the Polymarket leg already rules out
+    kalshi_markets = fetch_kalshi_markets_bulk(
+        market[1] for market, prices in zip(matched_markets, poly_prices) if polymarket_leg_viable(prices))  # kalshi_ticker
+
+    # Check arbitrage opportunities for every market at once, without further network calls
+    opportunities = find_arbitrage(poly_prices, [kalshi_markets.get(market[1]) for market in matched_markets])
 
     # Print results
     for opp in opportunities:
@@ -1,16 +1,27 @@
+import hashlib
+import itertools
+import os
 import sqlite3
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from kalshi_client.client import KalshiClient
 from cryptography.hazmat.primitives import serialization
 from py_clob_client.client import ClobClient
 from py_clob_client.constants import POLYGON
-from sentence_transformers import SentenceTransformer, util
 import re
+import numpy as np
+import config
+from cache import cached
 
 
+NUMBER_PATTERN = re.compile(r'\d+')  # Matches any sequence of digits
+NAME_PATTERN = re.compile(r'\b[A-Z][a-z]*\b')  # Matches capitalized words
+
 def extract_numbers(text):
-    return re.findall(r'\d+', text)  # Matches any sequence of digits
+    return NUMBER_PATTERN.findall(text)
 def extract_names(text):
-    return re.findall(r'\b[A-Z][a-z]*\b', text[1:len(text) - 1])  # Matches capitalized words
+    # Slice rather than pass pos: \b at pos would still see text[0] and change the matches
+    return NAME_PATTERN.findall(text[1:len(text) - 1])
 
 KALSHI_KEY_ID = "xxx"  # Replace with your Kalshi Key ID
 private_key_str = "xxx"  # Replace with your Kalshi private key file path
@@ -20,6 +31,10 @@ USDC_CONTRACT = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
 
 def setup_database():
     conn = sqlite3.connect("markets.db")
+    # WAL lets exArb read while matches are being written, and batches fsyncs on commit
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA mmap_size=268435456")
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS matched_markets (
@@ -30,83 +45,171 @@ def setup_database():
             kalshi_ticker TEXT
         )
     """)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_mm_pair'")
+    if cursor.fetchone() is None:
+        # One-time migration. Earlier runs inserted every match again; keep the first row of each pair
+        # so the unique index can be built
+        cursor.execute("""
+            DELETE FROM matched_markets
+            WHERE id NOT IN (SELECT MIN(id) FROM matched_markets GROUP BY polymarket_id, kalshi_ticker)
+        """)
+        # One row per market pair; also covers exArb's id-only SELECT, replacing the old non-unique index
+        cursor.execute("DROP INDEX IF EXISTS idx_mm_poly_kalshi")
+        cursor.execute("CREATE UNIQUE INDEX uq_mm_pair ON matched_markets(polymarket_id, kalshi_ticker)")
     conn.commit()
     return conn
 
-# Fetch Polymarket markets with pagination
+# Fetch Polymarket markets with pagination (metadata only, so safe to cache between runs)
+@cached(ttl=config.MARKET_CACHE_TTL_SECONDS)
 def fetch_polymarket_markets():
-    all_markets = []
+    pages = []
     next_cursor = ""
     limit = 100
 
     while True:
         response = polymarket_client.get_markets(next_cursor=next_cursor)
-        if "data" in response:
-            all_markets.extend(response["data"])
+        pages.append(response.get("data", []))
         next_cursor = response.get("next_cursor")
         if next_cursor == "LTE=" or not next_cursor:
             break
-    return all_markets
+    return list(itertools.chain.from_iterable(pages))
 
-# Fetch Kalshi markets with pagination
+# Fetch Kalshi markets with pagination (metadata only, so safe to cache between runs)
+@cached(ttl=config.MARKET_CACHE_TTL_SECONDS)
 def fetch_kalshi_markets():
-    all_markets = []
+    pages = []
     cursor = None
     limit = 100
 
     while True:
         response = kalshi_client.get_markets(cursor=cursor, limit=limit,status="open")
-        if "markets" in response:
-            all_markets.extend(response["markets"])
+        pages.append(response.get("markets", []))
         cursor = response.get("cursor")
         if not cursor:
             break
-    return all_markets
+    return list(itertools.chain.from_iterable(pages))
 
 
 
 
 
-# Load the SentenceTransformer model
-model = SentenceTransformer('all-mpnet-base-v2')  # Lightweight model for fast performance
+# torch and the SentenceTransformer model are imported on first use, so importing this module stays
+# cheap and a run whose embeddings are all cached never loads the model
+GPU_ENCODE_BATCH_SIZE = 256
+CPU_ENCODE_BATCH_SIZE = 32
+_model = None
 
-def find_best_matches(poly_markets, kalshi_markets, similarity_threshold=0.9):
+def get_device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def get_model():
     """
-    Use SentenceTransformers to find the best matching markets based on semantic similarity.
+    Load the SentenceTransformer model once, on the GPU in half precision when one is available.
     """
-    matches = []
-
-    # Encode all market questions and titles
-    poly_questions = [p_market["question"] for p_market in poly_markets if "question" in p_market]
-    kalshi_titles = ["" + k_market["title"] + k_market["subtitle"] for k_market in kalshi_markets if "title" in k_market]
+    global _model
+    if _model is None:
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        os.environ.setdefault("TRANSFORMERS_NO_ADVISORY_WARNINGS", "1")
+        from sentence_transformers import SentenceTransformer
+
+        device = get_device()
+        _model = SentenceTransformer('all-mpnet-base-v2', device=device)  # Lightweight model for fast performance
+        if device == "cuda":
+            _model = _model.half()
+    return _model
+
+# Embeddings persisted between runs, keyed by a hash of the encoded text
+EMBEDDING_CACHE_PATH = os.path.join(config.CACHE_DIR, "embeddings.npz")
+
+def text_key(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+def load_embedding_cache():
+    try:
+        with np.load(EMBEDDING_CACHE_PATH) as data:
+            return {key.tobytes(): vector for key, vector in zip(data["keys"], data["vectors"])}
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        # A missing or corrupt cache is rebuilt from scratch
+        return {}
+
+def save_embedding_cache(embedding_cache, texts):
+    # Only keep texts seen this run so closed markets don't accumulate
+    keys = list(dict.fromkeys(text_key(text) for text in texts))
+    if not keys:
+        return
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    # Written to a temporary file and swapped in, so an interrupted save can't leave a truncated cache
+    tmp_path = f"{EMBEDDING_CACHE_PATH}.tmp"
+    with open(tmp_path, "wb") as f:
+        # Keys are raw digests, stored as uint8 rows since fixed-width bytes arrays drop trailing NULs
+        np.savez(f, keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 16),
+                 vectors=np.stack([embedding_cache[key] for key in keys]))
+    os.replace(tmp_path, EMBEDDING_CACHE_PATH)
+
+def encode_cached(texts, embedding_cache):
+    """
+    Encode texts, only running the model on texts missing from embedding_cache.
+    Vectors are cached as float16 and returned as a normalized tensor on the GPU if available.
+    """
+    import torch
 
-    poly_embeddings = model.encode(poly_questions, convert_to_tensor=True)
-    kalshi_embeddings = model.encode(kalshi_titles, convert_to_tensor=True)
+    device = get_device()
+    keys = [text_key(text) for text in texts]
+    missing = list(dict.fromkeys(text for text, key in zip(texts, keys) if key not in embedding_cache))
+    if missing:
+        batch_size = GPU_ENCODE_BATCH_SIZE if device == "cuda" else CPU_ENCODE_BATCH_SIZE
+        vectors = get_model().encode(missing, batch_size=batch_size, convert_to_numpy=True,
+                                     normalize_embeddings=True, show_progress_bar=False)
+        for text, vector in zip(missing, vectors):
+            embedding_cache[text_key(text)] = vector.astype(np.float16)
 
-    # Compute pairwise cosine similarities
-    similarities = util.cos_sim(poly_embeddings, kalshi_embeddings)
+    embeddings = torch.from_numpy(np.stack([embedding_cache[key] for key in keys]))
+    return embeddings.to(device, dtype=torch.float16 if device == "cuda" else torch.float32)
 
-    # Find the best match for each Polymarket question
-    for i, p_market in enumerate(poly_markets):
-        if "question" not in p_market:
-            continue
+def find_best_matches(poly_markets, kalshi_markets, similarity_threshold=0.9):
+    """
+    Use SentenceTransformers to find the best matching markets based on semantic similarity.
+    """
+    matches = []
 
-        # Get similarity scores for the current Polymarket question
-        similarity_scores = similarities[i].tolist()
+    # Keep markets aligned with the rows/columns of the similarity matrix
+    poly_markets = [p_market for p_market in poly_markets if "question" in p_market]
+    kalshi_markets = [k_market for k_market in kalshi_markets if "title" in k_market]
 
-        # Find the best matching Kalshi market
-        best_match_index = max(range(len(similarity_scores)), key=lambda j: similarity_scores[j])
-        best_match_score = similarity_scores[best_match_index]
+    # Nothing to compare, and encoding/reducing over an empty side would fail
+    if not poly_markets or not kalshi_markets:
+        print("Found 0 best matches using SentenceTransformers.")
+        return matches
 
-        # Append if it meets the threshold
-        if best_match_score >= similarity_threshold:
-            matches.append({
-                "polymarket_question": p_market["question"],
-                "kalshi_title": kalshi_markets[best_match_index]["title"],
-                "polymarket_id": p_market.get("condition_id"),
-                "kalshi_ticker": kalshi_markets[best_match_index].get("ticker"),
-                "similarity_score": best_match_score
-            })
+    # Encode all market questions and titles
+    poly_questions = [p_market["question"] for p_market in poly_markets]
+    kalshi_titles = ["" + k_market["title"] + k_market["subtitle"] for k_market in kalshi_markets]
+
+    embedding_cache = load_embedding_cache()
+    poly_embeddings = encode_cached(poly_questions, embedding_cache)
+    kalshi_embeddings = encode_cached(kalshi_titles, embedding_cache)
+    save_embedding_cache(embedding_cache, poly_questions + kalshi_titles)
+
+    # Embeddings are unit length, so a single matmul gives the pairwise cosine similarities
+    similarities = (poly_embeddings @ kalshi_embeddings.T).float()
+
+    # Find the best matching Kalshi market for every Polymarket question in one reduction,
+    # and keep only those that meet the threshold
+    best_scores, best_indices = similarities.max(dim=1)
+    above_threshold = best_scores >= similarity_threshold
+    poly_indices = above_threshold.nonzero(as_tuple=True)[0].tolist()
+
+    for i, best_match_index, best_match_score in zip(poly_indices, best_indices[above_threshold].tolist(),
+                                                     best_scores[above_threshold].tolist()):
+        p_market = poly_markets[i]
+        matches.append({
+            "polymarket_question": p_market["question"],
+            "kalshi_title": kalshi_markets[best_match_index]["title"],
+            "polymarket_id": p_market.get("condition_id"),
+            "kalshi_ticker": kalshi_markets[best_match_index].get("ticker"),
+            "similarity_score": best_match_score
+        })
 
     print(f"Found {len(matches)} best matches using SentenceTransformers.")
     return matches
@@ -116,13 +219,15 @@ def find_best_matches(poly_markets, kalshi_markets, similarity_threshold=0.9):
 
 # Store matches in the database
 def store_matches(matches, conn):
-    cursor = conn.cursor()
-    for match in matches:
-        cursor.execute("""
-            INSERT INTO matched_markets (polymarket_question, kalshi_title, polymarket_id, kalshi_ticker)
+    rows = [(match["polymarket_question"], match["kalshi_title"], match["polymarket_id"], match["kalshi_ticker"])
+            for match in matches]
+    # One transaction for the whole batch: committed once, or rolled back entirely on error.
+    # Pairs already stored are skipped by the unique index.
+    with conn:
+        conn.executemany("""
+            INSERT OR IGNORE INTO matched_markets (polymarket_question, kalshi_title, polymarket_id, kalshi_ticker)
             VALUES (?, ?, ?, ?)
-        """, (match["polymarket_question"], match["kalshi_title"], match["polymarket_id"], match["kalshi_ticker"]))
-    conn.commit()
+        """, rows)
 
 # Main script
 if __name__ == "__main__":
@@ -136,9 +241,12 @@ if __name__ == "__main__":
     # Set up database
     conn = setup_database()
 
-    # Fetch markets
-    poly_markets = fetch_polymarket_markets()
-    kalshi_markets = fetch_kalshi_markets()
+    # Fetch markets; each platform's pages are cursor-chained, but the two platforms are independent
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        poly_future = executor.submit(fetch_polymarket_markets)
+        kalshi_future = executor.submit(fetch_kalshi_markets)
+        poly_markets = poly_future.result()
+        kalshi_markets = kalshi_future.result()
 
     # Find and store matches
     matches = find_best_matches(poly_markets, kalshi_markets)
@@ -4,10 +4,43 @@ Supports: Console, Discord, Telegram
 """
 import requests
 import json
-from datetime import datetime
-from typing import Dict, Any
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import config
 
+REQUEST_TIMEOUT_SECONDS = 5
+DISCORD_MAX_EMBEDS = 10  # Discord accepts at most 10 embeds per webhook message
+
+# Alert text, built once at import rather than as an f-string on every alert
+MESSAGE_TEMPLATE = """
+🚨 ARBITRAGE OPPORTUNITY DETECTED 🚨
+Time: {timestamp}
+
+📊 Market Details:
+Polymarket: {polymarket_question}
+Kalshi: {kalshi_title}
+
+💰 Opportunity Type: {type}
+
+💵 Prices:
+  • Polymarket {poly_side}: ${poly_price:.4f}
+  • Kalshi {kalshi_side}: ${kalshi_price:.4f}
+
+📈 Profit Margin (Gross): {profit_margin_pct:.2f}%
+💸 Profit Margin (Net): {net_profit_margin_pct:.2f}%
+
+⚠️ Risk Score: {risk_score}/10
+📍 Similarity Score: {similarity_pct:.1f}%
+
+💡 Example Trade ($1000):
+  • Expected Net Profit: ${expected_profit_1k:.2f}
+  • ROI: {roi_pct:.2f}%
+""".strip()
+
 
 class NotificationService:
     """Handles sending alerts about arbitrage opportunities"""
@@ -17,6 +50,14 @@ class NotificationService:
         self.discord_webhook = config.DISCORD_WEBHOOK_URL
         self.telegram_token = config.TELEGRAM_BOT_TOKEN
         self.telegram_chat_id = config.TELEGRAM_CHAT_ID
+        
+        # One pooled session so repeated alerts reuse the TLS connection to Discord/Telegram
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.1)
+        ))
     
     def send_alert(self, opportunity: Dict[str, Any]) -> bool:
         """
@@ -37,35 +78,46 @@ class NotificationService:
         else:  # console
             return self._send_console(message)
     
+    def send_alerts(self, opportunities: List[Dict[str, Any]]) -> bool:
+        """
+        Send alerts for several opportunities, batching Discord embeds into as few webhook calls as possible
+        
+        Args:
+            opportunities: List of opportunity dictionaries
+            
+        Returns:
+            bool: True if every alert was sent successfully
+        """
+        if self.alert_method != "discord":
+            results = [self.send_alert(opp) for opp in opportunities]
+            return all(results)
+        
+        embeds = [self._build_discord_embed(opp) for opp in opportunities]
+        results = [
+            self._post_discord(embeds[i:i + DISCORD_MAX_EMBEDS])
+            for i in range(0, len(embeds), DISCORD_MAX_EMBEDS)
+        ]
+        return all(results)
+    
     def _format_message(self, opp: Dict[str, Any]) -> str:
         """Format opportunity data into readable message"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        message = f"""
-🚨 ARBITRAGE OPPORTUNITY DETECTED 🚨
-Time: {timestamp}
-
-📊 Market Details:
-Polymarket: {opp.get('polymarket_question', 'N/A')}
-Kalshi: {opp.get('kalshi_title', 'N/A')}
-
-💰 Opportunity Type: {opp.get('type', 'N/A')}
-
-💵 Prices:
-  • Polymarket {opp.get('type', '').split('-')[0]}: ${opp.get('poly_price', 0):.4f}
-  • Kalshi {opp.get('type', '').split('-')[1] if '-' in opp.get('type', '') else ''}: ${opp.get('kalshi_price', 0):.4f}
-
-📈 Profit Margin (Gross): {opp.get('profit_margin', 0)*100:.2f}%
-💸 Profit Margin (Net): {opp.get('net_profit_margin', 0)*100:.2f}%
-
-⚠️ Risk Score: {opp.get('risk_score', 'N/A')}/10
-📍 Similarity Score: {opp.get('similarity_score', 0)*100:.1f}%
-
-💡 Example Trade ($1000):
-  • Expected Net Profit: ${opp.get('expected_profit_1k', 0):.2f}
-  • ROI: {opp.get('roi_1k', 0)*100:.2f}%
-"""
-        return message.strip()
+        opp_type = opp.get('type', '')
+        return MESSAGE_TEMPLATE.format(
+            timestamp=time.strftime("%Y-%m-%d %H:%M:%S"),
+            polymarket_question=opp.get('polymarket_question', 'N/A'),
+            kalshi_title=opp.get('kalshi_title', 'N/A'),
+            type=opp.get('type', 'N/A'),
+            poly_side=opp_type.split('-')[0],
+            kalshi_side=opp_type.split('-')[1] if '-' in opp_type else '',
+            poly_price=opp.get('poly_price', 0),
+            kalshi_price=opp.get('kalshi_price', 0),
+            profit_margin_pct=opp.get('profit_margin', 0)*100,
+            net_profit_margin_pct=opp.get('net_profit_margin', 0)*100,
+            risk_score=opp.get('risk_score', 'N/A'),
+            similarity_pct=opp.get('similarity_score', 0)*100,
+            expected_profit_1k=opp.get('expected_profit_1k', 0),
+            roi_pct=opp.get('roi_1k', 0)*100
+        )
     
     def _send_console(self, message: str) -> bool:
         """Print to console"""
@@ -76,62 +128,68 @@ Kalshi: {opp.get('kalshi_title', 'N/A')}
     
     def _send_discord(self, message: str, opp: Dict[str, Any]) -> bool:
         """Send alert via Discord webhook"""
+        return self._post_discord([self._build_discord_embed(opp)])
+    
+    def _build_discord_embed(self, opp: Dict[str, Any]) -> Dict[str, Any]:
+        """Create rich embed for Discord"""
+        return {
+            "title": "🚨 Arbitrage Opportunity",
+            "description": f"**{opp.get('type', 'Unknown')} Opportunity**",
+            "color": 3066993 if opp.get('net_profit_margin', 0) > 0.05 else 15844367,
+            "fields": [
+                {
+                    "name": "📊 Polymarket",
+                    "value": opp.get('polymarket_question', 'N/A')[:100],
+                    "inline": False
+                },
+                {
+                    "name": "📊 Kalshi",
+                    "value": opp.get('kalshi_title', 'N/A')[:100],
+                    "inline": False
+                },
+                {
+                    "name": "💵 Prices",
+                    "value": f"Poly: ${opp.get('poly_price', 0):.4f} | Kalshi: ${opp.get('kalshi_price', 0):.4f}",
+                    "inline": True
+                },
+                {
+                    "name": "📈 Net Profit",
+                    "value": f"{opp.get('net_profit_margin', 0)*100:.2f}%",
+                    "inline": True
+                },
+                {
+                    "name": "⚠️ Risk Score",
+                    "value": f"{opp.get('risk_score', 'N/A')}/10",
+                    "inline": True
+                },
+                {
+                    "name": "💡 $1k Trade Profit",
+                    "value": f"${opp.get('expected_profit_1k', 0):.2f}",
+                    "inline": True
+                }
+            ],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "footer": {
+                "text": f"Similarity: {opp.get('similarity_score', 0)*100:.1f}%"
+            }
+        }
+    
+    def _post_discord(self, embeds: List[Dict[str, Any]]) -> bool:
+        """Post one webhook message carrying up to DISCORD_MAX_EMBEDS embeds"""
         if not self.discord_webhook:
             print("⚠️  Discord webhook not configured")
             return False
         
         try:
-            # Create rich embed for Discord
-            embed = {
-                "title": "🚨 Arbitrage Opportunity",
-                "description": f"**{opp.get('type', 'Unknown')} Opportunity**",
-                "color": 3066993 if opp.get('net_profit_margin', 0) > 0.05 else 15844367,
-                "fields": [
-                    {
-                        "name": "📊 Polymarket",
-                        "value": opp.get('polymarket_question', 'N/A')[:100],
-                        "inline": False
-                    },
-                    {
-                        "name": "📊 Kalshi",
-                        "value": opp.get('kalshi_title', 'N/A')[:100],
-                        "inline": False
-                    },
-                    {
-                        "name": "💵 Prices",
-                        "value": f"Poly: ${opp.get('poly_price', 0):.4f} | Kalshi: ${opp.get('kalshi_price', 0):.4f}",
-                        "inline": True
-                    },
-                    {
-                        "name": "📈 Net Profit",
-                        "value": f"{opp.get('net_profit_margin', 0)*100:.2f}%",
-                        "inline": True
-                    },
-                    {
-                        "name": "⚠️ Risk Score",
-                        "value": f"{opp.get('risk_score', 'N/A')}/10",
-                        "inline": True
-                    },
-                    {
-                        "name": "💡 $1k Trade Profit",
-                        "value": f"${opp.get('expected_profit_1k', 0):.2f}",
-                        "inline": True
-                    }
-                ],
-                "timestamp": datetime.utcnow().isoformat(),
-                "footer": {
-                    "text": f"Similarity: {opp.get('similarity_score', 0)*100:.1f}%"
-                }
-            }
-            
             payload = {
-                "embeds": [embed]
+                "embeds": embeds
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.discord_webhook,
-                json=payload,
-                headers={"Content-Type": "application/json"}
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=REQUEST_TIMEOUT_SECONDS
             )
             
             if response.status_code == 204:
@@ -159,7 +217,12 @@ Kalshi: {opp.get('kalshi_title', 'N/A')}
                 "parse_mode": "Markdown"
             }
             
-            response = requests.post(url, json=payload)
+            response = self.http.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=REQUEST_TIMEOUT_SECONDS
+            )
             
             if response.status_code == 200:
                 print("✅ Telegram alert sent successfully")
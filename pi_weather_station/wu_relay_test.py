@@ -4,14 +4,19 @@ WU Relay: Scrape weather from multiple stations, average, upload.
 
 Run: python3 wu_relay_test.py          # loop every 20 min
 Run: python3 wu_relay_test.py --once   # single run then exit
+
+Set WU_API_KEY to read source stations from the PWS API instead of scraping their dashboards.
 """
+import os
 import re
 import sys
-import time
 import json
-import urllib.request
+import time
 import urllib.parse
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # =============================================================================
 # CONFIG
@@ -25,120 +30,302 @@ SOURCE_STATIONS = [
 WU_STATION_ID = "IETIME4"
 WU_STATION_KEY = "1TekZfvP"
 WU_UPLOAD_URL = "https://weatherstation.wunderground.com/weatherstation/updateweatherstation.php"
+# Optional: with an API key, source stations are read from the PWS API instead of scraping their dashboards
+WU_API_KEY = os.getenv("WU_API_KEY", "")
+WU_API_URL = "https://api.weather.com/v2/pws/observations/current"
 RELAY_INTERVAL = 20 * 60  # 20 minutes
+DASHBOARD_CHUNK_SIZE = 16 * 1024  # Bytes read per chunk while streaming a dashboard page
+UNCHANGED_UPLOAD_MAX_AGE = 60 * 60  # Re-upload unchanged readings at least hourly so the station stays online
+STALE_READING_MAX_AGE = 60 * 60  # Reuse a station's last good reading for up to 1 hour if a scrape fails
 
 # Discord webhook for notifications
 DISCORD_WEBHOOK = "https://discord.com/api/webhooks/1467961370187403515/vXF38N-41_naJLAsjj3zTnzVVtFuKIHsS26zklIpnwwDRoI466DxMRz2Ch9pOt0Q_aav"
 # =============================================================================
 
 
+# One pooled session for scraping, uploading and Discord, so the station fetches
+# in a cycle share a TLS connection instead of handshaking per request
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+))
+
+# The station credentials never change, so that half of the upload query string is encoded once
+UPLOAD_URL_PREFIX = WU_UPLOAD_URL + "?" + urllib.parse.urlencode({
+    "ID": WU_STATION_ID,
+    "PASSWORD": WU_STATION_KEY,
+    "dateutc": "now",
+    "action": "updateraw",
+})
+
+# Fields read from the latest observation; some sit in its "imperial" block, some outside it
+FIELD_NAMES = ("tempAvg", "tempHigh", "humidityAvg", "pressureMax", "dewptAvg", "windspeedAvg",
+               "windgustHigh", "winddirAvg", "precipRate", "precipTotal", "uvHigh")
+
+# Reading key -> (observation fields in order of preference, converter)
+READING_FIELDS = {
+    "temp_f": (("tempAvg", "tempHigh"), float),
+    "humidity": (("humidityAvg",), float),
+    "baromin": (("pressureMax",), float),
+    "dewpt_f": (("dewptAvg",), float),
+    "windspeed_mph": (("windspeedAvg",), float),
+    "windgust_mph": (("windgustHigh",), float),
+    "winddir": (("winddirAvg",), int),
+    "precip_rate": (("precipRate",), float),
+    "precip_daily": (("precipTotal",), float),
+    "uv": (("uvHigh",), float),
+}
+
+# PWS API field for each dashboard field (the API reports current values, not Avg/High)
+API_FIELDS = {
+    "tempAvg": "temp",
+    "humidityAvg": "humidity",
+    "pressureMax": "pressure",
+    "dewptAvg": "dewpt",
+    "windspeedAvg": "windSpeed",
+    "windgustHigh": "windGust",
+    "winddirAvg": "winddir",
+    "precipRate": "precipRate",
+    "precipTotal": "precipTotal",
+    "uvHigh": "uv",
+}
+
+# Page patterns, compiled once rather than looked up in re's cache on every scrape.
+# Everything they match is ASCII, so pages are searched as raw bytes without decoding.
+OBSERVATIONS_KEY = b'"observations":'
+# A JSON string (matched whole, so brackets inside it aren't counted) or a bracket
+ARRAY_TOKEN_PATTERN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]]')
+OBSERVATION_START = b'{"stationID"'
+OBSERVATION_PATTERN = re.compile(rb'\{"stationID"[^}]+?"imperial":\s*\{[^}]+\}\}')
+FIELDS_PATTERN = re.compile(rb'"(' + "|".join(FIELD_NAMES).encode() + rb')":\s*([\d.]+)')
+
+# The observations sit in an inline script; nothing after its closing tag is needed
+SCRIPT_END = b"</script>"
+
+# Last good reading per station: station_id -> (time.monotonic() when scraped, reading)
+_last_readings = {}
+
+
+def clock():
+    """Current local time as HH:MM:SS for log lines."""
+    return time.strftime("%H:%M:%S")
+
+
 def send_discord(message):
     """Send a message to Discord webhook."""
     if not DISCORD_WEBHOOK:
         return
     try:
-        data = json.dumps({"content": message}).encode("utf-8")
-        req = urllib.request.Request(
-            DISCORD_WEBHOOK,
-            data=data,
-            headers={"Content-Type": "application/json", "User-Agent": "Mozilla/5.0"}
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            pass
+        resp = SESSION.post(DISCORD_WEBHOOK, json={"content": message}, timeout=10)
+        resp.raise_for_status()
     except Exception as e:
         print(f"Discord error: {e}")
 
 
-def scrape_station(station_id):
+def describe_error(e):
     """
-    Scrape latest weather from a WU station dashboard.
-    Returns dict with all available fields, or None on failure.
+    Summarize a request error without its message, which quotes the request URL
+    and with it the station password or API key.
     """
-    url = f"https://www.wunderground.com/dashboard/pws/{station_id}"
-    
+    response = getattr(e, "response", None)
+    if response is not None:
+        return f"{type(e).__name__} (HTTP {response.status_code})"
+    return type(e).__name__
+
+
+def is_number(value):
+    # JSON nulls (e.g. UV at night) and booleans are treated as missing
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def fetch_api_observation(station_id):
+    """
+    Fetch a station's current observation from the WU PWS API.
+    Returns its fields under the dashboard's names, or None on failure.
+    """
+    # Without numericPrecision the API rounds imperial values to whole numbers
+    params = {"stationId": station_id, "format": "json", "units": "e", "numericPrecision": "decimal",
+              "apiKey": WU_API_KEY}
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            html = resp.read().decode("utf-8", errors="replace")
+        resp = SESSION.get(WU_API_URL, params=params, timeout=10)
+        resp.raise_for_status()
+        # 204 means the station has no recent observation
+        observations = resp.json().get("observations") if resp.status_code != 204 else None
     except Exception as e:
-        print(f"  [{station_id}] Fetch error: {e}")
+        print(f"  [{station_id}] API error: {describe_error(e)}")
+        return None
+    if not observations:
+        print(f"  [{station_id}] No API observation")
         return None
     
-    # Find observations array and get the LAST (most recent) entry
-    m = re.search(r'"observations":\s*\[(.+?)\]\s*[,}]', html, re.DOTALL)
-    if not m:
-        print(f"  [{station_id}] No observations found")
+    obs = {**observations[0], **(observations[0].get("imperial") or {})}
+    return {name: float(obs[key]) for name, key in API_FIELDS.items() if is_number(obs.get(key))}
+
+
+def find_observations(html):
+    """
+    Locate the page's observations array with bytes.find and a bracket-depth scan.
+    Returns the array text, brackets included, or None if it's missing or unterminated.
+    """
+    key_at = html.find(OBSERVATIONS_KEY)
+    if key_at < 0:
+        return None
+    start = html.find(b"[", key_at + len(OBSERVATIONS_KEY))
+    if start < 0 or html[key_at + len(OBSERVATIONS_KEY):start].strip():
         return None
     
-    obs_matches = re.findall(r'\{"stationID"[^}]+?"imperial":\s*\{[^}]+\}\}', m.group(1))
-    if not obs_matches:
-        print(f"  [{station_id}] No observation data")
+    depth = 0
+    for token in ARRAY_TOKEN_PATTERN.finditer(html, start):
+        if token.group() == b"[":
+            depth += 1
+        elif token.group() == b"]":
+            depth -= 1
+            if not depth:
+                return html[start:token.end()]
+    return None
+
+
+def parse_observation_json(array_text):
+    """
+    Decode the observations array as JSON.
+    Returns the numeric fields of the LAST (most recent) entry, or None if the array isn't valid JSON.
+    """
+    try:
+        observations = json.loads(array_text)
+    except ValueError:
+        return None
+    if not isinstance(observations, list):
         return None
     
-    latest = obs_matches[-1]
-    out = {"station_id": station_id}
+    observations = [obs for obs in observations if isinstance(obs, dict) and isinstance(obs.get("imperial"), dict)]
+    if not observations:
+        return None
     
-    # === TEMPERATURE ===
-    m = re.search(r'"tempAvg":\s*([\d.]+)', latest)
-    if m:
-        out["temp_f"] = float(m.group(1))
+    latest = {**observations[-1], **observations[-1]["imperial"]}
+    return {name: float(latest[name]) for name in FIELD_NAMES if is_number(latest.get(name))}
+
+
+def parse_observation_regex(array_text):
+    """
+    Fallback for pages where the observations array doesn't decode as JSON.
+    Returns the fields of the LAST (most recent) entry, or None if none is found.
+    """
+    # Walk back from the end to the last entry that matches, rather than matching every entry
+    start = array_text.rfind(OBSERVATION_START)
+    while start >= 0:
+        latest = OBSERVATION_PATTERN.match(array_text, start)
+        if latest:
+            break
+        start = array_text.rfind(OBSERVATION_START, 0, start)
     else:
-        m = re.search(r'"tempHigh":\s*([\d.]+)', latest)
-        if m:
-            out["temp_f"] = float(m.group(1))
-    
-    # === HUMIDITY === (outside imperial block)
-    m = re.search(r'"humidityAvg":\s*([\d.]+)', latest)
-    if m:
-        out["humidity"] = float(m.group(1))
-    
-    # === PRESSURE ===
-    m = re.search(r'"pressureMax":\s*([\d.]+)', latest)
-    if m:
-        out["baromin"] = float(m.group(1))
-    
-    # === DEWPOINT ===
-    m = re.search(r'"dewptAvg":\s*([\d.]+)', latest)
-    if m:
-        out["dewpt_f"] = float(m.group(1))
-    
-    # === WIND SPEED ===
-    m = re.search(r'"windspeedAvg":\s*([\d.]+)', latest)
-    if m:
-        out["windspeed_mph"] = float(m.group(1))
+        return None
     
-    # === WIND GUST ===
-    m = re.search(r'"windgustHigh":\s*([\d.]+)', latest)
-    if m:
-        out["windgust_mph"] = float(m.group(1))
+    # One pass over the entry for every field; keep each field's first occurrence
+    fields = {}
+    for name, value in FIELDS_PATTERN.findall(latest.group()):
+        fields.setdefault(name.decode(), float(value))
+    return fields
+
+
+def stale_reading(station_id):
+    """
+    Fall back to a station's last good reading when a scrape fails,
+    so a brief WU outage doesn't drop the station from the average.
+    Returns a copy marked with its age in seconds under "stale_age",
+    or None if there is no reading younger than STALE_READING_MAX_AGE.
+    """
+    entry = _last_readings.get(station_id)
+    if not entry:
+        return None
+    age = time.monotonic() - entry[0]
+    if age >= STALE_READING_MAX_AGE:
+        return None
+    print(f"  [{station_id}] Using last reading from {age / 60:.0f} min ago")
+    return {**entry[1], "stale_age": age}
+
+
+def fetch_dashboard(url):
+    """
+    Stream a dashboard page, stopping at the end of the script that holds the observations.
+    Returns the raw page bytes read so far (the whole page if the marker never appears).
+    """
+    page = bytearray()
+    marker_at = -1
+    with SESSION.get(url, timeout=15, stream=True) as resp:
+        resp.raise_for_status()
+        for chunk in resp.iter_content(DASHBOARD_CHUNK_SIZE):
+            scanned = len(page)
+            page += chunk
+            # Step back so a needle split across chunks is still found
+            if marker_at < 0:
+                marker_at = page.find(OBSERVATIONS_KEY, max(0, scanned - len(OBSERVATIONS_KEY) + 1))
+            if marker_at >= 0 and page.find(SCRIPT_END, max(marker_at, scanned - len(SCRIPT_END) + 1)) >= 0:
+                break
+    return bytes(page)
+
+
+def scrape_dashboard(station_id):
+    """
+    Scrape the latest observation from a WU station dashboard.
+    Returns its fields, or None on failure.
+    """
+    url = f"https://www.wunderground.com/dashboard/pws/{station_id}"
     
-    # === WIND DIRECTION === (outside imperial block)
-    m = re.search(r'"winddirAvg":\s*([\d.]+)', latest)
-    if m:
-        out["winddir"] = int(float(m.group(1)))
+    try:
+        html = fetch_dashboard(url)
+    except Exception as e:
+        print(f"  [{station_id}] Fetch error: {e}")
+        return None
     
-    # === PRECIP RATE ===
-    m = re.search(r'"precipRate":\s*([\d.]+)', latest)
-    if m:
-        out["precip_rate"] = float(m.group(1))
+    observations = find_observations(html)
+    fields = observations and (parse_observation_json(observations) or parse_observation_regex(observations))
+    if not fields:
+        print(f"  [{station_id}] No observations found")
+        return None
+    return fields
+
+
+def build_reading(station_id, fields):
+    """
+    Convert a station's observation fields into a reading.
+    Returns dict with all available fields, or None if there is no temperature.
+    """
+    if not fields:
+        return None
     
-    # === PRECIP TOTAL (daily) ===
-    m = re.search(r'"precipTotal":\s*([\d.]+)', latest)
-    if m:
-        out["precip_daily"] = float(m.group(1))
+    out = {"station_id": station_id}
     
-    # === UV INDEX === (can be null)
-    m = re.search(r'"uvHigh":\s*([\d.]+)', latest)
-    if m:
-        out["uv"] = float(m.group(1))
+    # Temperature falls back to the high when there is no average
+    for key, (names, convert) in READING_FIELDS.items():
+        name = next((name for name in names if name in fields), None)
+        if name is not None:
+            out[key] = convert(fields[name])
     
     if not out.get("temp_f"):
         print(f"  [{station_id}] No temperature found")
         return None
-    
     return out
 
 
+def scrape_station(station_id):
+    """
+    Get the latest weather for a source station, from the PWS API when WU_API_KEY is set,
+    otherwise (or if the API gives no temperature) from its dashboard.
+    Returns dict with all available fields, the last good reading if both fail, or None.
+    """
+    reading = build_reading(station_id, fetch_api_observation(station_id)) if WU_API_KEY else None
+    if reading is None:
+        reading = build_reading(station_id, scrape_dashboard(station_id))
+    if reading is None:
+        return stale_reading(station_id)
+    
+    _last_readings[station_id] = (time.monotonic(), reading)
+    return reading
+
+
 def scrape_and_average():
     """
     Scrape all source stations and return averaged values.
@@ -146,8 +333,11 @@ def scrape_and_average():
     """
     readings = []
     
-    for station_id in SOURCE_STATIONS:
-        obs = scrape_station(station_id)
+    # Fetches are network-bound, so scrape every station at once; map keeps SOURCE_STATIONS order
+    with ThreadPoolExecutor(max_workers=len(SOURCE_STATIONS)) as executor:
+        results = list(executor.map(scrape_station, SOURCE_STATIONS))
+    
+    for station_id, obs in zip(SOURCE_STATIONS, results):
         if obs:
             readings.append(obs)
             temp_c = (obs["temp_f"] - 32) * 5 / 9
@@ -156,80 +346,90 @@ def scrape_and_average():
     if not readings:
         return None
     
-    # Average all fields
-    avg = {}
-    
-    # Helper to average a field across readings
-    def avg_field(key):
-        vals = [r[key] for r in readings if r.get(key) is not None]
-        return sum(vals) / len(vals) if vals else None
+    # Average all fields in one pass; a field no station reported averages to None
+    sums = dict.fromkeys(READING_FIELDS, 0.0)
+    counts = dict.fromkeys(READING_FIELDS, 0)
+    for r in readings:
+        for key in READING_FIELDS:
+            value = r.get(key)
+            if value is not None:
+                sums[key] += value
+                counts[key] += 1
     
-    avg["temp_f"] = avg_field("temp_f")
-    avg["humidity"] = avg_field("humidity")
-    avg["baromin"] = avg_field("baromin")
-    avg["dewpt_f"] = avg_field("dewpt_f")
-    avg["windspeed_mph"] = avg_field("windspeed_mph")
-    avg["windgust_mph"] = avg_field("windgust_mph")
-    avg["winddir"] = avg_field("winddir")
-    avg["precip_rate"] = avg_field("precip_rate")
-    avg["precip_daily"] = avg_field("precip_daily")
-    avg["uv"] = avg_field("uv")
+    avg = {key: sums[key] / counts[key] if counts[key] else None for key in READING_FIELDS}
     
     return avg, readings, len(readings)
 
 
-def upload_weather(obs):
+def build_upload_query(obs):
     """
-    Upload weather observation to destination station.
-    Returns (success: bool, response: str).
+    Format an observation as the measurement half of the upload query string,
+    at the precision each field is sent with.
     """
-    params = {
-        "ID": WU_STATION_ID,
-        "PASSWORD": WU_STATION_KEY,
-        "dateutc": "now",
-        "action": "updateraw",
-    }
+    # Values are formatted numbers, so they can be appended without URL-encoding
+    query = []
     
     # Required
     if obs.get("temp_f") is not None:
-        params["tempf"] = f"{obs['temp_f']:.1f}"
+        query.append(f"&tempf={obs['temp_f']:.1f}")
     
     # Optional fields
     if obs.get("humidity") is not None:
-        params["humidity"] = f"{obs['humidity']:.0f}"
+        query.append(f"&humidity={obs['humidity']:.0f}")
     
     if obs.get("baromin") is not None:
-        params["baromin"] = f"{obs['baromin']:.2f}"
+        query.append(f"&baromin={obs['baromin']:.2f}")
     
     if obs.get("dewpt_f") is not None:
-        params["dewptf"] = f"{obs['dewpt_f']:.1f}"
+        query.append(f"&dewptf={obs['dewpt_f']:.1f}")
     
     if obs.get("windspeed_mph") is not None:
-        params["windspeedmph"] = f"{obs['windspeed_mph']:.1f}"
+        query.append(f"&windspeedmph={obs['windspeed_mph']:.1f}")
     
     if obs.get("windgust_mph") is not None:
-        params["windgustmph"] = f"{obs['windgust_mph']:.1f}"
+        query.append(f"&windgustmph={obs['windgust_mph']:.1f}")
     
     if obs.get("winddir") is not None:
-        params["winddir"] = f"{obs['winddir']:.0f}"
+        query.append(f"&winddir={obs['winddir']:.0f}")
     
     if obs.get("precip_rate") is not None:
-        params["rainin"] = f"{obs['precip_rate']:.2f}"
+        query.append(f"&rainin={obs['precip_rate']:.2f}")
     
     if obs.get("precip_daily") is not None:
-        params["dailyrainin"] = f"{obs['precip_daily']:.2f}"
+        query.append(f"&dailyrainin={obs['precip_daily']:.2f}")
     
     if obs.get("uv") is not None:
-        params["UV"] = f"{obs['uv']:.1f}"
-    
-    url = f"{WU_UPLOAD_URL}?{urllib.parse.urlencode(params)}"
+        query.append(f"&UV={obs['uv']:.1f}")
     
+    return "".join(query)
+
+
+def upload_weather(query):
+    """
+    Upload an observation, formatted by build_upload_query, to destination station.
+    Returns (success: bool, response: str).
+    """
     try:
-        with urllib.request.urlopen(url, timeout=10) as resp:
-            body = resp.read().decode("utf-8").strip()
-            return body == "success", body
+        resp = SESSION.get(UPLOAD_URL_PREFIX + query, timeout=10)
+        resp.raise_for_status()
+        body = resp.content.strip()
+        # Compare raw bytes; only an error body needs decoding for display
+        if body == b"success":
+            return True, "success"
+        return False, body.decode("utf-8", errors="replace")
     except Exception as e:
-        return False, str(e)
+        return False, describe_error(e)
+
+
+def unchanged_since(query, last_upload):
+    """
+    Check whether query is identical to the last successful upload's,
+    and that upload is recent enough to skip this one.
+    """
+    if last_upload is None:
+        return False
+    uploaded_at, last_query = last_upload
+    return query == last_query and time.monotonic() - uploaded_at < UNCHANGED_UPLOAD_MAX_AGE
 
 
 def format_obs(obs, show_all=False):
@@ -260,48 +460,69 @@ def main():
     print(f"Interval: {RELAY_INTERVAL // 60} min" if not once else "Mode: single run")
     print("=" * 60)
     
+    # Runs are scheduled on a fixed monotonic grid, so the time spent scraping doesn't push later runs back
+    next_run = time.monotonic()
+    last_upload = None  # (time.monotonic() when uploaded, upload query)
+    
     while True:
-        print(f"\n[{datetime.now():%H:%M:%S}] Scraping {len(SOURCE_STATIONS)} station(s)...")
+        print(f"\n[{clock()}] Scraping {len(SOURCE_STATIONS)} station(s)...")
         
         result = scrape_and_average()
         
         if not result:
-            print(f"[{datetime.now():%H:%M:%S}] All stations failed to scrape")
+            print(f"[{clock()}] All stations failed to scrape")
             send_discord("❌ **WU Relay:** All stations failed to scrape")
         else:
             avg, readings, count = result
             
-            success, response = upload_weather(avg)
-            
-            # Build Discord message
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            discord_msg = f"**WU Relay** ({timestamp})\n\n"
-            discord_msg += "**📡 Scraped:**\n"
-            for r in readings:
-                temp_c = (r["temp_f"] - 32) * 5 / 9
-                discord_msg += f"• {r['station_id']}: {r['temp_f']:.1f}°F ({temp_c:.1f}°C)"
-                if r.get("humidity"):
-                    discord_msg += f" | 💧{r['humidity']:.0f}%"
-                if r.get("windspeed_mph"):
-                    discord_msg += f" | 💨{r['windspeed_mph']:.1f}mph"
-                discord_msg += "\n"
-            
-            discord_msg += f"\n**📤 Uploaded to {WU_STATION_ID}:**\n"
-            if success:
-                discord_msg += f"✅ {format_obs(avg, show_all=True)}"
-            else:
-                discord_msg += f"❌ Failed: {response}"
-            
-            send_discord(discord_msg)
-            
-            if success:
-                print(f"[{datetime.now():%H:%M:%S}] AVG from {count} station(s): {format_obs(avg)} → uploaded OK")
+            # Compare what would be sent, so only an identical upload is skipped
+            query = build_upload_query(avg)
+            if unchanged_since(query, last_upload):
+                print(f"[{clock()}] AVG from {count} station(s) unchanged since last upload, skipping")
             else:
-                print(f"[{datetime.now():%H:%M:%S}] Upload failed: {response}")
+                success, response = upload_weather(query)
+                if success:
+                    last_upload = (time.monotonic(), query)
+                
+                # Build Discord message
+                timestamp = clock()
+                discord_msg = f"**WU Relay** ({timestamp})\n\n"
+                discord_msg += "**📡 Scraped:**\n"
+                for r in readings:
+                    temp_c = (r["temp_f"] - 32) * 5 / 9
+                    discord_msg += f"• {r['station_id']}: {r['temp_f']:.1f}°F ({temp_c:.1f}°C)"
+                    if r.get("humidity"):
+                        discord_msg += f" | 💧{r['humidity']:.0f}%"
+                    if r.get("windspeed_mph"):
+                        discord_msg += f" | 💨{r['windspeed_mph']:.1f}mph"
+                    if "stale_age" in r:
+                        discord_msg += f" | ⏳ stale, {r['stale_age'] / 60:.0f} min old"
+                    discord_msg += "\n"
+                
+                discord_msg += f"\n**📤 Uploaded to {WU_STATION_ID}:**\n"
+                if success:
+                    discord_msg += f"✅ {format_obs(avg, show_all=True)}"
+                else:
+                    discord_msg += f"❌ Failed: {response}"
+                
+                send_discord(discord_msg)
+                
+                if success:
+                    print(f"[{clock()}] AVG from {count} station(s): {format_obs(avg)} → uploaded OK")
+                else:
+                    print(f"[{clock()}] Upload failed: {response}")
         
         if once:
             break
-        time.sleep(RELAY_INTERVAL)
+        
+        next_run += RELAY_INTERVAL
+        now = time.monotonic()
+        if next_run <= now:
+            # Overran the interval; skip the missed slots rather than running back to back
+            skipped = int((now - next_run) // RELAY_INTERVAL) + 1
+            next_run += skipped * RELAY_INTERVAL
+            print(f"[{clock()}] Run overran the interval, skipping {skipped} slot(s)")
+        time.sleep(next_run - now)
 
 
 if __name__ == "__main__":